@@ -15,6 +15,7 @@
 #include <stdio.h>
 
 #include "core/path.h"
+#include "core/strext.h"
 #include "core/map.h"
 
 #include "tokenizer/vocab.h"
@@ -32,6 +33,7 @@ struct CLIParams {
     char* input_path;  ///< Input text corpus (plaintext)
     char* output_dir;  ///< Output directory for model files
     int merges;  ///< Number of BPE merges to perform
+    bool cache;  ///< Reuse a sidecar vocab cache next to the input
     bool verbose;  ///< Enable verbose/debug output
 };
 
@@ -39,10 +41,11 @@ struct CLIParams {
  * @brief Print usage instructions for the tokenizer trainer.
  */
 void cli_usage(const char* prog) {
-    printf("Usage: %s --input S --output S [--merges N] [--verbose]\n", prog);
+    printf("Usage: %s --input S --output S [--merges N] [--cache] [--verbose]\n", prog);
     printf("  --input    -i  Input plaintext corpus file (required)\n");
     printf("  --output   -o  Output directory for tokenizer model (required)\n");
     printf("  --merges   -m  Number of BPE merges (default: 10)\n");
+    printf("  --cache    -c  Reuse a sidecar vocab cache next to the input\n");
     printf("  --verbose  -v  Enable debug output\n");
     printf("  --help     -h  Show this help message\n");
 }
@@ -71,6 +74,7 @@ void cli_parse(struct CLIParams* cli) {
     cli->input_path = NULL;
     cli->output_dir = NULL;
     cli->merges = 10;
+    cli->cache = false;
     cli->verbose = false;
 
     for (int i = 1; i < cli->argc; ++i) {
@@ -83,6 +87,8 @@ void cli_parse(struct CLIParams* cli) {
             if (cli->merges < 1) {
                 cli->merges = 10;
             }
+        } else if (cli_is_flag(cli->argv[i], "--cache", "-c")) {
+            cli->cache = true;
         } else if (cli_is_flag(cli->argv[i], "--verbose", "-v")) {
             cli->verbose = true;
         } else if (cli_is_flag(cli->argv[i], "--help", "-h")) {
@@ -133,8 +139,16 @@ int main(int argc, const char* argv[]) {
         }
     }
 
-    // Build vocabulary from input text
-    HashMap* vocab = vocab_build(cli.input_path);
+    // Build vocabulary from input text, reusing the sidecar cache
+    // (<input>.vocab) across runs when enabled
+    HashMap* vocab = NULL;
+    if (cli.cache) {
+        char* cache_path = string_concat(cli.input_path, ".vocab");
+        vocab = vocab_build_cached(cli.input_path, cache_path);
+        free(cache_path);
+    } else {
+        vocab = vocab_build(cli.input_path);
+    }
     if (!vocab) {
         fprintf(stderr, "Error: Failed to build vocab from '%s'.\n", cli.input_path);
         cli_free(&cli);
@@ -31,6 +31,9 @@ bool path_is_dir(const char* path);
 // Checks if path is a regular file
 bool path_is_file(const char* path);
 
+// Returns the last-modification time in seconds (-1 on error)
+long path_mtime(const char* path);
+
 // Saner mkdir wrapper (true on success, false on failure)
 bool path_mkdir(const char* path);
 
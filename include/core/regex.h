@@ -6,6 +6,7 @@
 #define REGEX_H
 
 #include <stdbool.h>
+#include <stddef.h>
 
 #define PCRE2_CODE_UNIT_WIDTH 8
 #include <pcre2.h>
@@ -32,4 +33,22 @@ bool regex_compile(const char* pattern, pcre2_code** code, pcre2_match_data** ma
  */
 void regex_free(pcre2_code* code, pcre2_match_data* match);
 
+/**
+ * @brief Splits a string into parts matching an already compiled pattern.
+ *
+ * Compile the pattern once with regex_compile() and reuse it across
+ * calls; the per-call cost is matching only.
+ *
+ * @param src   Null-terminated string.
+ * @param code  Compiled PCRE2 code object.
+ * @param match PCRE2 match data object created for code.
+ * @param count Output: number of parts.
+ * @return      Array of pointers to null-terminated substrings (each newly allocated),
+ *              or NULL on error.
+ *
+ * @note Only matched regions are included in output (GPT-2 BPE style).
+ * @note Caller must free each result and the array.
+ */
+char** regex_split(const char* src, pcre2_code* code, pcre2_match_data* match, size_t* count);
+
 #endif  // REGEX_H
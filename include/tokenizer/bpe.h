@@ -93,37 +93,15 @@ BPEModel* bpe_load(const char* path);
  * @{
  */
 
-/**
- * @brief Collect all adjacent symbol pairs and their frequencies from a vocabulary.
- *
- * @param vocab   HashMap* of words to frequency (tokens as space-delimited symbol strings).
- * @return HashMap* mapping pair string ("A B") to int* frequency. Caller must free with
- * vocab_map_free().
- */
-HashMap* bpe_pairs(HashMap* vocab);
-
-/**
- * @brief Select the highest-frequency symbol pair from a pairs map.
- *
- * @param pairs      HashMap* mapping pair strings to int* frequency.
- * @param out_freq   (Optional) Pointer to int to receive the best frequency.
- * @return Heap-allocated NUL-terminated string for the best pair ("A B"), or NULL if empty. Caller
- * must free.
- */
-char* bpe_best(HashMap* pairs, int* out_freq);
-
-/**
- * @brief Merge all occurrences of the given best pair in the vocabulary.
- *
- * @param vocab      HashMap* vocabulary (token string -> int* freq).
- * @param best_pair  NUL-terminated string for the pair to merge ("A B").
- * @return New HashMap* with merged pairs. Caller must free with vocab_map_free().
- */
-HashMap* bpe_merges(HashMap* vocab, const char* best_pair);
-
 /**
  * @brief Train a BPE model with a fixed number of merge steps.
  *
+ * Internally the vocabulary is interned into an integer-id corpus:
+ * every symbol gets a small id, words become id arrays, pair counts
+ * are keyed by packed (a, b) id pairs, and merges compare ids instead
+ * of strings. Only the emitted merge records use the space-delimited
+ * string form.
+ *
  * @param vocab      Input vocabulary (token string -> int* freq). Not consumed or freed.
  * @param n_merges   Number of merges to perform.
  * @param verbose    If true, prints intermediate steps.
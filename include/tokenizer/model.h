@@ -45,7 +45,9 @@ typedef struct Tokenizer {
     SpecialToken* special; /**< Special token markers. */
     void* scores; /**< (Internal) Merge scores map. */
     void* token_to_id; /**< (Internal) Token-to-id hashmap. */
+    void* merges; /**< (Internal) Packed (a, b) id pair -> merge lookup. */
     char** id_to_token; /**< Array: index maps to token string. */
+    int byte_to_id[256]; /**< Dense byte -> id fast path (-1 if unmapped). */
     int vocab_size; /**< Number of tokens in vocabulary. */
 } Tokenizer;
 
@@ -181,6 +181,19 @@ HashMap* vocab_tokenize(const char* text);
  */
 HashMap* vocab_build(const char* path);
 
+/**
+ * @brief Builds a vocab map from a plain text file with a sidecar cache.
+ *
+ * When cache_path exists and is at least as new as the source file, the
+ * cached binary vocab is loaded instead of re-reading and re-tokenizing
+ * the corpus. Otherwise the vocab is rebuilt and the cache refreshed.
+ *
+ * @param path Path to the plain text file.
+ * @param cache_path Path to the binary sidecar cache (vocab_map_save format).
+ * @return HashMap* mapping (symbol sequence) -> (int* frequency), or NULL on failure.
+ */
+HashMap* vocab_build_cached(const char* path, const char* cache_path);
+
 /** @} */
 
 #ifdef __cplusplus
@@ -39,12 +39,18 @@ int hash_int32_cmp(const void* key1, const void* key2) {
 
 uint64_t hash_int64(const void* key, uint64_t size, uint64_t i) {
     const int64_t* k = (int64_t*) key;
-    uint64_t hash = *k * HASH_KNUTH;  // Knuth's multiplicative
+    // Multiply as unsigned: packed pair keys exceed 32 bits, and a
+    // signed overflow here is undefined behavior
+    uint64_t hash = (uint64_t) *k * HASH_KNUTH;  // Knuth's multiplicative
     return (hash + i) % size;
 }
 
 int hash_int64_cmp(const void* key1, const void* key2) {
-    return *(const int64_t*) key1 - *(const int64_t*) key2;
+    const int64_t a = *(const int64_t*) key1;
+    const int64_t b = *(const int64_t*) key2;
+    // The difference truncates to int: keys differing only in the high
+    // 32 bits would compare equal. Compare, don't subtract.
+    return (a > b) - (a < b);
 }
 
 /** @} */
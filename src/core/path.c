@@ -54,6 +54,19 @@ bool path_is_file(const char* path) {
     return S_ISREG(buffer.st_mode);
 }
 
+// Returns the last-modification time in seconds
+long path_mtime(const char* path) {
+    if (!path_is_valid(path)) {
+        return -1;
+    }
+
+    struct stat buffer;
+    if (stat(path, &buffer) != 0) {
+        return -1;
+    }
+    return (long) buffer.st_mtime;
+}
+
 // Saner mkdir wrapper
 bool path_mkdir(const char* path) {
     if (mkdir(path, 0755) == -1 && errno != EEXIST) {
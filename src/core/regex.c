@@ -2,6 +2,10 @@
  * @file core/regex.c
  */
 
+#include <stdlib.h>
+#include <string.h>
+
+#include "core/strext.h"
 #include "core/regex.h"
 
 bool regex_compile(const char* pattern, pcre2_code** code, pcre2_match_data** match) {
@@ -45,3 +49,43 @@ void regex_free(pcre2_code* code, pcre2_match_data* match) {
         pcre2_code_free(code);
     }
 }
+
+char** regex_split(const char* src, pcre2_code* code, pcre2_match_data* match, size_t* count) {
+    if (!src || !code || !match || !count) {
+        return NULL;
+    }
+    *count = 0;
+
+    char** parts = calloc(1, sizeof(char*));
+    size_t total_bytes = strlen(src);
+    if (!parts || total_bytes == 0) {
+        free(parts);
+        return NULL;
+    }
+
+    size_t offset = 0;
+    while (offset < total_bytes) {
+        int rc = pcre2_match(
+            code, (PCRE2_SPTR) (src + offset), total_bytes - offset, 0, 0, match, NULL
+        );
+        if (rc < 0) {
+            break;
+        }
+
+        PCRE2_SIZE* ovector = pcre2_get_ovector_pointer(match);
+        size_t match_start = ovector[0];
+        size_t match_end = ovector[1];
+
+        if (match_end > match_start) {
+            parts = string_append_n(
+                src + offset + match_start, match_end - match_start, parts, count
+            );
+            if (!parts) {
+                return NULL;
+            }
+        }
+        offset += match_end;
+    }
+
+    return parts;
+}
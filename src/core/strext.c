@@ -360,38 +360,9 @@ char** string_split_regex(const char* src, const char* pattern, size_t* count) {
         return NULL;
     }
 
-    char** parts = calloc(1, sizeof(char*));
-    size_t total_bytes = strlen(src);
-    if (!parts || total_bytes <= 0) {
-        regex_free(code, match);
-        return NULL;
-    }
-
-    size_t offset = 0;
-    while (offset < total_bytes) {
-        int rc = pcre2_match(
-            code, (PCRE2_SPTR) (src + offset), total_bytes - offset, 0, 0, match, NULL
-        );
-        if (rc < 0) {
-            break;
-        }
-
-        PCRE2_SIZE* ovector = pcre2_get_ovector_pointer(match);
-        size_t match_start = ovector[0];
-        size_t match_end = ovector[1];
-
-        if (match_end > match_start) {
-            parts = string_append_n(
-                src + offset + match_start, match_end - match_start, parts, count
-            );
-            if (!parts) {
-                regex_free(code, match);
-                return NULL;
-            }
-        }
-        offset += match_end;
-    }
-
+    // One-shot convenience path; reuse regex_split() with a compiled
+    // pattern when splitting many strings with the same pattern.
+    char** parts = regex_split(src, code, match, count);
     regex_free(code, match);
     return parts;
 }
@@ -253,6 +253,8 @@ void tensor_fill(Tensor* t, float value) {
                 src[i] = value;
             }
 
+            // Rows are independent: each quantizes the shared read-only buffer
+#pragma omp parallel for
             for (size_t r = 0; r < rows; r++) {
                 void* dst = tensor_view_row(t, r);
                 quant_vec(dst, src, cols, t->id);
@@ -106,144 +106,626 @@ BPEModel* bpe_load(const char* path) {
 
 /** @} */
 
-// collect vocab pairs
-// once all pairs have been exhausted,
-// the pairs function must return NULL to indicate the end of operation
-HashMap* bpe_pairs(HashMap* vocab) {
-    HashMap* new_pairs = hash_map_create(hash_capacity(vocab), HASH_STR);
+// Write the pair key "a b" into a growable scratch buffer.
+// Avoids a heap allocation per probed pair; returns NULL on error.
+static char* bpe_pair_key(char** buf, size_t* cap, const char* a, const char* b) {
+    size_t a_len = strlen(a);
+    size_t b_len = strlen(b);
+    size_t need = a_len + b_len + 2;  // space + NUL
+
+    if (need > *cap) {
+        char* temp = realloc(*buf, need);
+        if (!temp) {
+            return NULL;
+        }
+        *buf = temp;
+        *cap = need;
+    }
 
-    HashEntry* entry;
-    HashIt it = hash_iter(vocab);
-    while ((entry = hash_iter_next(&it))) {
-        size_t sym_count = 0;
-        char** syms = string_split_delim(entry->key, " ", &sym_count);
-
-        for (size_t i = 0; i < sym_count - 1; i++) {
-            // Create the symbol tuple
-            char* tuple[] = {syms[i], syms[i + 1]};
-
-            // Create the symbol pair
-            char* pair = string_join(tuple, 2, " ");
-
-            // Check for pair existence
-            int* freq = hash_map_search(new_pairs, pair);
-            if (!freq) {  // pair does not exist
-                int* new_freq = malloc(sizeof(int));
-                *new_freq = *(int*) entry->value;
-                hash_map_insert(new_pairs, pair, new_freq);
-            } else {  // pair already exists
-                *freq += *(int*) entry->value;
-                free(pair);
-            }
+    memcpy(*buf, a, a_len);
+    (*buf)[a_len] = ' ';
+    memcpy(*buf + a_len + 1, b, b_len);
+    (*buf)[a_len + 1 + b_len] = '\0';
+    return *buf;
+}
+
+/**
+ * @def BPE_PAIR_KEY
+ * @brief Pack two symbol ids into a single int64 pair key.
+ *
+ * The first lane is biased by one so a packed key is never zero: pair
+ * maps store the key inline as a HASH_PTR key (no allocation per key),
+ * and the hash container reserves NULL for empty slots.
+ */
+#define BPE_PAIR_KEY(a, b) (((int64_t) ((a) + 1) << 32) | (uint32_t) (b))
+
+/** @brief Unpack the first symbol id from a packed pair key. */
+#define BPE_PAIR_A(k) ((int) ((k) >> 32) - 1)
+
+/** @brief Unpack the second symbol id from a packed pair key. */
+#define BPE_PAIR_B(k) ((int) (uint32_t) (k))
+
+/** @brief View a packed pair key as an inline HASH_PTR key. */
+#define BPE_PAIR_PTR(k) ((void*) (uintptr_t) (k))
+
+// Inline keys require a pointer wide enough to hold a packed pair; on
+// a 32-bit target the cast would silently truncate and alias every
+// pair sharing a second symbol. Fail the build instead.
+_Static_assert(
+    sizeof(void*) >= sizeof(int64_t), "BPE_PAIR_PTR requires pointers to hold 64-bit pair keys"
+);
+
+/**
+ * Interned symbol corpus
+ *
+ * Training never manipulates space-joined strings directly. Every
+ * symbol is interned to a small integer id once, words become arrays
+ * of ids, and merge comparisons are plain integer equality. Strings
+ * are only rebuilt at the boundaries (pair-count keys and model
+ * emission).
+ * @{
+ */
+
+// Bidirectional symbol intern table (symbol string <-> id)
+typedef struct BPESymbols {
+    HashMap* to_id;  ///< Symbol string -> int* id.
+    char** to_sym;  ///< Id -> symbol string (owns nothing; aliases map keys).
+    size_t count;  ///< Number of interned symbols.
+    size_t capacity;  ///< Allocated slots in to_sym.
+} BPESymbols;
+
+// A single corpus word as interned symbol ids plus its frequency
+typedef struct BPEWord {
+    int* syms;  ///< Symbol ids (slice into the corpus arena).
+    size_t count;  ///< Number of symbols.
+    int freq;  ///< Corpus frequency.
+} BPEWord;
+
+// Flat corpus: all symbol ids live in one contiguous arena and words
+// are slices into it. Merges only ever shrink a word, so every slice
+// stays valid for the lifetime of the corpus.
+typedef struct BPECorpus {
+    BPEWord* words;  ///< Word slices over the arena.
+    int* arena;  ///< Contiguous symbol-id storage.
+    size_t count;  ///< Number of words.
+} BPECorpus;
+
+static bool bpe_symbols_init(BPESymbols* table) {
+    table->count = 0;
+    table->capacity = 256;
+    table->to_sym = malloc(table->capacity * sizeof(char*));
+    table->to_id = hash_map_create(table->capacity, HASH_STR);
+    if (!table->to_sym || !table->to_id) {
+        free(table->to_sym);
+        hash_map_free(table->to_id);
+        return false;
+    }
+    return true;
+}
+
+static void bpe_symbols_free(BPESymbols* table) {
+    if (table->to_id) {
+        // Map keys alias the to_sym entries: free them exactly once
+        hash_iter_free_all(table->to_id, free, free);
+    }
+    free(table->to_sym);
+}
+
+// Return the id for a symbol, interning it on first sight (-1 on error)
+static int bpe_symbols_intern(BPESymbols* table, const char* sym) {
+    int* id = hash_map_search(table->to_id, sym);
+    if (id) {
+        return *id;
+    }
+
+    // Grow the reverse table if needed
+    if (table->count == table->capacity) {
+        size_t new_cap = table->capacity * 2;
+        char** temp = realloc(table->to_sym, new_cap * sizeof(char*));
+        if (!temp) {
+            return -1;
+        }
+        table->to_sym = temp;
+        table->capacity = new_cap;
+    }
+
+    char* key = strdup(sym);
+    int* value = malloc(sizeof(int));
+    if (!key || !value) {
+        free(key);
+        free(value);
+        return -1;
+    }
+
+    *value = (int) table->count;
+    hash_map_insert(table->to_id, key, value);
+    table->to_sym[table->count] = key;  // alias of the map key
+    return (int) table->count++;
+}
+
+/**
+ * Pair-candidate max-heap
+ *
+ * Selection never rescans the whole pair map. Every count change
+ * pushes a fresh (pair, count) entry; pops validate the entry against
+ * the live count and lazily discard stale ones. Ordering is count
+ * descending with ties broken on the lexicographically smallest
+ * "a b" string, matching the original full-scan selection exactly.
+ * @{
+ */
+
+// One heap candidate: a pair, its count at push time, and its string
+// form (owned; used only for tie ordering)
+typedef struct BPEHeapEntry {
+    int64_t key;  ///< Packed pair key.
+    int freq;  ///< Count when pushed (stale if it no longer matches).
+    char* str;  ///< "a b" form for tie-breaks (heap-allocated).
+} BPEHeapEntry;
+
+typedef struct BPEHeap {
+    BPEHeapEntry* entries;  ///< Binary max-heap storage.
+    size_t count;  ///< Live entries.
+    size_t capacity;  ///< Allocated slots.
+    BPESymbols* table;  ///< Borrowed: renders pair strings on push.
+} BPEHeap;
+
+// Render the "a b" form of a packed pair (heap-allocated)
+static char* bpe_heap_render(BPEHeap* heap, int64_t key) {
+    const char* a = heap->table->to_sym[BPE_PAIR_A(key)];
+    const char* b = heap->table->to_sym[BPE_PAIR_B(key)];
+    size_t a_len = strlen(a);
+    size_t b_len = strlen(b);
+
+    char* str = malloc(a_len + b_len + 2);
+    if (!str) {
+        return NULL;
+    }
+
+    memcpy(str, a, a_len);
+    str[a_len] = ' ';
+    memcpy(str + a_len + 1, b, b_len + 1);
+    return str;
+}
+
+// True when x outranks y (higher count, then smaller pair string)
+static inline bool bpe_heap_before(const BPEHeapEntry* x, const BPEHeapEntry* y) {
+    if (x->freq != y->freq) {
+        return x->freq > y->freq;
+    }
+    return strcmp(x->str, y->str) < 0;
+}
+
+static inline void bpe_heap_swap(BPEHeap* heap, size_t i, size_t j) {
+    BPEHeapEntry temp = heap->entries[i];
+    heap->entries[i] = heap->entries[j];
+    heap->entries[j] = temp;
+}
+
+// Restore heap order upward from slot i
+static void bpe_heap_up(BPEHeap* heap, size_t i) {
+    while (i > 0) {
+        size_t parent = (i - 1) / 2;
+        if (!bpe_heap_before(&heap->entries[i], &heap->entries[parent])) {
+            break;
+        }
+        bpe_heap_swap(heap, i, parent);
+        i = parent;
+    }
+}
+
+// Restore heap order downward from slot i
+static void bpe_heap_down(BPEHeap* heap, size_t i) {
+    while (true) {
+        size_t left = 2 * i + 1;
+        size_t right = left + 1;
+        size_t top = i;
+
+        if (left < heap->count && bpe_heap_before(&heap->entries[left], &heap->entries[top])) {
+            top = left;
         }
+        if (right < heap->count && bpe_heap_before(&heap->entries[right], &heap->entries[top])) {
+            top = right;
+        }
+        if (top == i) {
+            break;
+        }
+
+        bpe_heap_swap(heap, i, top);
+        i = top;
+    }
+}
+
+static void bpe_heap_push(BPEHeap* heap, int64_t key, int freq) {
+    char* str = bpe_heap_render(heap, key);
+    if (!str) {
+        return;
+    }
+
+    if (heap->count == heap->capacity) {
+        size_t new_cap = heap->capacity ? heap->capacity * 2 : 64;
+        BPEHeapEntry* temp = realloc(heap->entries, new_cap * sizeof(BPEHeapEntry));
+        if (!temp) {
+            free(str);
+            return;
+        }
+        heap->entries = temp;
+        heap->capacity = new_cap;
+    }
+
+    heap->entries[heap->count] = (BPEHeapEntry) {key, freq, str};
+    bpe_heap_up(heap, heap->count++);
+}
+
+// Pop validated entries until one matches its live count
+static bool bpe_heap_best(BPEHeap* heap, HashMap* pairs, int64_t* out_key, int* out_freq) {
+    while (heap->count > 0) {
+        BPEHeapEntry top = heap->entries[0];
 
-        string_split_free(syms, sym_count);
+        // pop the root
+        heap->entries[0] = heap->entries[--heap->count];
+        if (heap->count > 0) {
+            bpe_heap_down(heap, 0);
+        }
+        free(top.str);
+
+        // lazy deletion: drop entries whose count has since changed
+        int* freq = hash_map_search(pairs, BPE_PAIR_PTR(top.key));
+        if (freq && *freq > 0 && *freq == top.freq) {
+            *out_key = top.key;
+            *out_freq = top.freq;
+            return true;
+        }
     }
 
-    return new_pairs;
+    return false;  // exhausted all pairs
 }
 
-char* bpe_best(HashMap* pairs, int* out_freq) {
-    char* best_pair = NULL;
-    int best_freq = -1;
+static BPEHeap* bpe_heap_create(HashMap* pairs, BPESymbols* table) {
+    BPEHeap* heap = calloc(1, sizeof(BPEHeap));
+    if (!heap) {
+        return NULL;
+    }
+    heap->table = table;
 
+    // Seed with the initial counts in one pass
     HashEntry* entry;
     HashIt it = hash_iter(pairs);
     while ((entry = hash_iter_next(&it))) {
-        char* pair = entry->key;
         int* freq = entry->value;
+        if (*freq > 0) {
+            bpe_heap_push(heap, (int64_t) (uintptr_t) entry->key, *freq);
+        }
+    }
+
+    return heap;
+}
 
-        if (*freq > best_freq) {
-            best_pair = pair;
-            best_freq = *freq;
-        } else if (*freq == best_freq && best_pair && strcmp(pair, best_pair) < 0) {
-            best_pair = pair;  // lexicographic tie-break
+static void bpe_heap_free(BPEHeap* heap) {
+    if (heap) {
+        for (size_t i = 0; i < heap->count; i++) {
+            free(heap->entries[i].str);
         }
+        free(heap->entries);
+        free(heap);
     }
+}
+
+/** @} */
 
-    if (out_freq) {
-        *out_freq = best_freq;
+// Apply a signed delta to a packed pair count, pushing the new count
+// onto the candidate heap (heap may be NULL during the initial count)
+static void bpe_pair_update(HashMap* pairs, int64_t key, int delta, BPEHeap* heap) {
+    int* freq = hash_map_search(pairs, BPE_PAIR_PTR(key));
+    if (!freq) {
+        if (delta > 0) {
+            int* new_freq = malloc(sizeof(int));
+            if (!new_freq) {
+                return;
+            }
+            *new_freq = delta;
+            hash_map_insert(pairs, BPE_PAIR_PTR(key), new_freq);
+            freq = new_freq;
+        } else {
+            return;
+        }
+    } else {
+        // Entries may decay to zero; stale heap entries are discarded
+        *freq += delta;
     }
 
-    // Caller must validate and free best pair
-    return best_pair ? strdup(best_pair) : NULL;
+    if (heap && *freq > 0) {
+        bpe_heap_push(heap, key, *freq);
+    }
 }
 
-HashMap* bpe_merges(HashMap* vocab, const char* best_pair) {
-    if (!vocab || !best_pair) {
-        return NULL;  // exhausted all pairs
+// Word-index postings for a pair. Append-only: entries go stale when
+// a later merge removes the pair from a word, and the merge probe
+// skips them, so nothing is ever deleted.
+typedef struct BPEIndex {
+    int* words;  ///< Word indices that contained the pair when counted.
+    size_t count;  ///< Number of recorded indices.
+    size_t capacity;  ///< Allocated slots.
+} BPEIndex;
+
+// Record that word w contributed to a pair
+static void bpe_index_update(HashMap* index, int64_t key, int w) {
+    BPEIndex* posting = hash_map_search(index, BPE_PAIR_PTR(key));
+    if (!posting) {
+        posting = calloc(1, sizeof(BPEIndex));
+        if (!posting) {
+            return;
+        }
+        hash_map_insert(index, BPE_PAIR_PTR(key), posting);
+    }
+
+    // Occurrences within one word arrive consecutively: cheap dedup
+    if (posting->count > 0 && posting->words[posting->count - 1] == w) {
+        return;
+    }
+
+    if (posting->count == posting->capacity) {
+        size_t new_cap = posting->capacity ? posting->capacity * 2 : 4;
+        int* temp = realloc(posting->words, new_cap * sizeof(int));
+        if (!temp) {
+            return;
+        }
+        posting->words = temp;
+        posting->capacity = new_cap;
     }
 
-    // Parse tuple: (a, b)
-    size_t tuple_count = 0;
-    char** tuple = string_split_delim(best_pair, " ", &tuple_count);
-    if (tuple_count != 2) {
-        string_split_free(tuple, tuple_count);
+    posting->words[posting->count++] = w;
+}
+
+static void bpe_index_free(HashMap* index) {
+    if (index) {
+        HashEntry* entry;
+        HashIt it = hash_iter(index);
+        while ((entry = hash_iter_next(&it))) {
+            BPEIndex* posting = entry->value;
+            free(posting->words);
+        }
+        // Keys are inline packed pairs: only the postings are owned
+        hash_iter_free_all(index, NULL, free);
+    }
+}
+
+// Free a packed pair-count map (keys are inline, values are owned)
+static void bpe_pairs_free(HashMap* pairs) {
+    if (pairs) {
+        hash_iter_free_all(pairs, NULL, free);
+    }
+}
+
+// Intern a string vocab (word -> freq) into a flat corpus.
+// Merges never make two words collide (each word still spells its
+// original text), so no re-aggregation map is needed afterwards.
+static BPECorpus* bpe_corpus_create(HashMap* vocab, BPESymbols* table) {
+    BPECorpus* corpus = calloc(1, sizeof(BPECorpus));
+    if (!corpus) {
         return NULL;
     }
-    const char* a = tuple[0];
-    const char* b = tuple[1];
 
-    // New vocab map
-    HashMap* new_vocab = hash_map_create(hash_capacity(vocab), HASH_STR);
+    corpus->count = hash_count(vocab);
+    corpus->words = calloc(corpus->count + 1, sizeof(BPEWord));
+    if (!corpus->words) {
+        free(corpus);
+        return NULL;
+    }
 
+    // First pass: size the arena (words are single-space joined)
+    size_t total_syms = 0;
     HashEntry* entry;
     HashIt it = hash_iter(vocab);
     while ((entry = hash_iter_next(&it))) {
-        // Split word into symbols
+        size_t sym_count = 1;
+        for (const char* p = entry->key; *p; p++) {
+            if (*p == ' ') {
+                sym_count++;
+            }
+        }
+        total_syms += sym_count;
+    }
+
+    corpus->arena = malloc((total_syms + 1) * sizeof(int));
+    if (!corpus->arena) {
+        free(corpus->words);
+        free(corpus);
+        return NULL;
+    }
+
+    // Scratch for one symbol at a time: interning dedups into the
+    // table, so no per-symbol split allocations are needed
+    size_t sym_cap = 64;
+    char* sym = malloc(sym_cap);
+    if (!sym) {
+        free(corpus->arena);
+        free(corpus->words);
+        free(corpus);
+        return NULL;
+    }
+
+    // Second pass: intern every symbol into the arena sequentially
+    size_t w = 0;
+    size_t offset = 0;
+    it = hash_iter(vocab);
+    while ((entry = hash_iter_next(&it))) {
+        int* ids = corpus->arena + offset;
         size_t sym_count = 0;
-        char** syms = string_split_delim(entry->key, " ", &sym_count);
-
-        // Prepare output buffer (never longer than input)
-        size_t out_count = 0;
-        char** out = calloc(sym_count, sizeof(char*));
-
-        size_t i = 0;
-        while (i < sym_count) {
-            if (i + 1 < sym_count && strcmp(syms[i], a) == 0 && strcmp(syms[i + 1], b) == 0) {
-                // Merge: concat a + b
-                out[out_count++] = string_concat(a, b);
-                i += 2;  // skip b
-            } else {
-                out[out_count++] = strdup(syms[i]);
-                i += 1;
+
+        const char* p = entry->key;
+        while (*p) {
+            // Slice the next space-delimited symbol into scratch
+            const char* start = p;
+            while (*p && *p != ' ') {
+                p++;
+            }
+
+            size_t len = (size_t) (p - start);
+            if (len + 1 > sym_cap) {
+                char* temp = realloc(sym, len + 1);
+                if (!temp) {
+                    free(sym);
+                    free(corpus->arena);
+                    free(corpus->words);
+                    free(corpus);
+                    return NULL;
+                }
+                sym = temp;
+                sym_cap = len + 1;
+            }
+            memcpy(sym, start, len);
+            sym[len] = '\0';
+
+            ids[sym_count++] = bpe_symbols_intern(table, sym);
+            if (*p == ' ') {
+                p++;
             }
         }
 
-        // Join tokens into new word (space-delimited)
-        char* new_word = string_join(out, out_count, " ");
+        corpus->words[w].syms = ids;
+        corpus->words[w].count = sym_count;
+        corpus->words[w].freq = *(int*) entry->value;
+        offset += sym_count;
+        w++;
+    }
 
-        // Insert new word into new vocab
-        int* freq = hash_map_search(new_vocab, new_word);
-        if (!freq) {
-            int* new_freq = malloc(sizeof(int));
-            *new_freq = *(int*) entry->value;
-            hash_map_insert(new_vocab, new_word, new_freq);
-        } else {
-            *freq += *(int*) entry->value;
-            free(new_word);
+    free(sym);
+    return corpus;
+}
+
+static void bpe_corpus_free(BPECorpus* corpus) {
+    if (corpus) {
+        free(corpus->arena);
+        free(corpus->words);
+        free(corpus);
+    }
+}
+
+// Flush the corpus to standard output (mirrors vocab_map_log)
+static void bpe_corpus_log(BPECorpus* corpus, BPESymbols* table) {
+    printf("Vocab:\n");
+    for (size_t i = 0; i < corpus->count; i++) {
+        BPEWord* word = &corpus->words[i];
+        printf("  ");
+        for (size_t j = 0; j < word->count; j++) {
+            printf(j ? " %s" : "%s", table->to_sym[word->syms[j]]);
         }
+        printf(" -> %d\n", word->freq);
+    }
+    printf("\n");
+}
+
+// Count all adjacent symbol pairs across the corpus (packed int64
+// keys) and index which words contain each pair
+static HashMap* bpe_corpus_pairs(BPECorpus* corpus, HashMap* index) {
+    HashMap* pairs = hash_map_create(corpus->count + 1, HASH_PTR);
+    if (!pairs) {
+        return NULL;
+    }
 
-        // Free intermediate arrays
-        string_split_free(out, out_count);
-        string_split_free(syms, sym_count);
+    for (size_t w = 0; w < corpus->count; w++) {
+        BPEWord* word = &corpus->words[w];
+
+        // Slide a prev/cur window so each symbol is read once
+        int prev = word->syms[0];
+        for (size_t i = 1; i < word->count; i++) {
+            int cur = word->syms[i];
+            int64_t key = BPE_PAIR_KEY(prev, cur);
+            bpe_pair_update(pairs, key, word->freq, NULL);
+            bpe_index_update(index, key, (int) w);
+            prev = cur;
+        }
     }
 
-    string_split_free(tuple, tuple_count);
-    return new_vocab;
+    return pairs;
 }
 
+// Flush the packed pair counts to standard output (mirrors vocab_map_log)
+static void bpe_pairs_log(HashMap* pairs, BPESymbols* table) {
+    HashEntry* entry;
+    HashIt it = hash_iter(pairs);
+    printf("Vocab:\n");
+    while ((entry = hash_iter_next(&it))) {
+        int64_t key = (int64_t) (uintptr_t) entry->key;
+        int* freq = entry->value;
+        printf("  %s %s -> %d\n", table->to_sym[BPE_PAIR_A(key)], table->to_sym[BPE_PAIR_B(key)],
+               *freq);
+    }
+    printf("\n");
+}
+
+// Merge every (a, b) occurrence in a word into ab, moving the word's
+// adjacent pair counts incrementally (old subtracted, new added) and
+// indexing the word under its new pairs.
+static void bpe_corpus_merge(
+    BPEWord* word, int w, int a, int b, int ab, HashMap* pairs, HashMap* index, BPEHeap* heap
+) {
+    // Most words are untouched by any given merge: probe first
+    bool found = false;
+    for (size_t i = 0; i + 1 < word->count; i++) {
+        if (word->syms[i] == a && word->syms[i + 1] == b) {
+            found = true;
+            break;
+        }
+    }
+    if (!found) {
+        return;
+    }
+
+    // Subtract the old adjacent pairs (sliding prev/cur window)
+    int prev = word->syms[0];
+    for (size_t i = 1; i < word->count; i++) {
+        int cur = word->syms[i];
+        bpe_pair_update(pairs, BPE_PAIR_KEY(prev, cur), -word->freq, heap);
+        prev = cur;
+    }
+
+    // Rewrite the word in place: merges only ever shrink it, so the
+    // write head never catches the read head
+    size_t out_count = 0;
+    size_t i = 0;
+    while (i < word->count) {
+        if (i + 1 < word->count && word->syms[i] == a && word->syms[i + 1] == b) {
+            word->syms[out_count++] = ab;
+            i += 2;  // skip b
+        } else {
+            word->syms[out_count++] = word->syms[i];
+            i += 1;
+        }
+    }
+    word->count = out_count;
+
+    // Add the new adjacent pairs (sliding prev/cur window)
+    prev = word->syms[0];
+    for (size_t j = 1; j < word->count; j++) {
+        int cur = word->syms[j];
+        int64_t key = BPE_PAIR_KEY(prev, cur);
+        bpe_pair_update(pairs, key, word->freq, heap);
+        bpe_index_update(index, key, w);
+        prev = cur;
+    }
+}
+
+/** @} */
+
 BPEModel* bpe_train(HashMap* vocab, size_t n_merges, bool verbose) {
-    // Create a shallow copy of the input vocab
-    HashMap* internal_vocab = vocab_map_copy(vocab);  // always copy!
-    if (!internal_vocab) {
+    // Intern the input vocab into an id corpus (input is not consumed)
+    BPESymbols table;
+    if (!bpe_symbols_init(&table)) {
+        return NULL;
+    }
+
+    BPECorpus* corpus = bpe_corpus_create(vocab, &table);
+    if (!corpus) {
+        bpe_symbols_free(&table);
         return NULL;
     }
 
     // Create a new BPE model
     BPEModel* model = malloc(sizeof(BPEModel));
     if (!model) {
-        vocab_map_free(internal_vocab);
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
         return NULL;
     }
 
@@ -252,30 +734,78 @@ BPEModel* bpe_train(HashMap* vocab, size_t n_merges, bool verbose) {
     model->capacity = 8;
     model->merges = malloc(model->capacity * sizeof(BPEMerge));
     if (!model->merges) {
-        vocab_map_free(internal_vocab);
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
+        bpe_free(model);
+        return NULL;
+    }
+
+    // Scratch key reused by every pair-count probe
+    size_t key_cap = 64;
+    char* key = malloc(key_cap);
+    if (!key) {
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
+        bpe_free(model);
+        return NULL;
+    }
+
+    // Inverted index: packed pair -> words that contain it
+    HashMap* index = hash_map_create(corpus->count + 1, HASH_PTR);
+    if (!index) {
+        free(key);
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
+        bpe_free(model);
+        return NULL;
+    }
+
+    // Build the symbol pair counts once; merges update them in place
+    HashMap* pairs = bpe_corpus_pairs(corpus, index);
+    if (!pairs) {
+        free(key);
+        bpe_index_free(index);
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
+        bpe_free(model);
+        return NULL;
+    }
+
+    // Seed the candidate heap from the initial counts; merges push
+    // fresh entries as counts move
+    BPEHeap* heap = bpe_heap_create(pairs, &table);
+    if (!heap) {
+        free(key);
+        bpe_pairs_free(pairs);
+        bpe_index_free(index);
+        bpe_corpus_free(corpus);
+        bpe_symbols_free(&table);
         bpe_free(model);
         return NULL;
     }
 
     // Execute BPE merge steps
     for (size_t i = 0; i < n_merges; i++) {
-        // Build symbol pairs from vocab
-        HashMap* pairs = bpe_pairs(internal_vocab);
         if (verbose) {
-            vocab_map_log(pairs);  // debug
+            bpe_pairs_log(pairs, &table);  // debug
         }
 
-        // Calculate the best pairs
+        // Pop the best pair, discarding stale candidates along the way
+        int64_t best_key;
         int best_freq;
-        char* best_pair = bpe_best(pairs, &best_freq);
-        if (!best_pair) {
+        if (!bpe_heap_best(heap, pairs, &best_key, &best_freq)) {
             printf("[bpe] Exhausted all possible merge pairs at step %zu.\n", i);
-            vocab_map_free(pairs);
             break;
         }
 
-        // Observe the best merge pair
-        printf("[bpe] step=%zu, best_freq=%d, best_pair=%s\n", i, best_freq, best_pair);
+        int a = BPE_PAIR_A(best_key);
+        int b = BPE_PAIR_B(best_key);
+        char* best_pair = bpe_pair_key(&key, &key_cap, table.to_sym[a], table.to_sym[b]);
+
+        // Observe the best merge pair (per-step output is debug only)
+        if (verbose) {
+            printf("[bpe] step=%zu, best_freq=%d, best_pair=%s\n", i, best_freq, best_pair);
+        }
 
         // Grow array if needed
         if (model->count == model->capacity) {
@@ -283,9 +813,12 @@ BPEModel* bpe_train(HashMap* vocab, size_t n_merges, bool verbose) {
             BPEMerge* temp = realloc(model->merges, new_cap * sizeof(BPEMerge));
             if (!temp) {
                 // Free everything up to now
-                free(best_pair);
-                vocab_map_free(pairs);
-                vocab_map_free(internal_vocab);
+                free(key);
+                bpe_heap_free(heap);
+                bpe_pairs_free(pairs);
+                bpe_index_free(index);
+                bpe_corpus_free(corpus);
+                bpe_symbols_free(&table);
                 bpe_free(model);
                 return NULL;
             }
@@ -293,27 +826,49 @@ BPEModel* bpe_train(HashMap* vocab, size_t n_merges, bool verbose) {
             model->capacity = new_cap;
         }
 
+        // The merged symbol gets a fresh id on its first appearance
+        char* merged = string_concat(table.to_sym[a], table.to_sym[b]);
+        int ab = bpe_symbols_intern(&table, merged);
+        free(merged);
+
         // Append the best merge pair
         model->merges[model->count++] = (BPEMerge) {strdup(best_pair), best_freq};
 
-        // Merge all matching pairs
-        HashMap* new_vocab = bpe_merges(internal_vocab, best_pair);
+        // Merge only the indexed words, moving counts incrementally
+        BPEIndex* posting = hash_map_search(index, BPE_PAIR_PTR(best_key));
+        if (posting) {
+            for (size_t p = 0; p < posting->count; p++) {
+                int w = posting->words[p];
+                bpe_corpus_merge(&corpus->words[w], w, a, b, ab, pairs, index, heap);
+            }
+            // Every entry is now stale; reuse the slots if the pair
+            // ever becomes adjacent again through a later merge
+            posting->count = 0;
+        }
         if (verbose) {
-            vocab_map_log(new_vocab);
+            bpe_corpus_log(corpus, &table);
         }
+    }
+
+    // One summary line regardless of verbosity
+    printf("[bpe] Learned %zu merge(s).\n\n", model->count);
 
-        // Clean up
-        free(best_pair);
-        vocab_map_free(pairs);
-        vocab_map_free(internal_vocab);
+    free(key);
+    bpe_heap_free(heap);
+    bpe_pairs_free(pairs);
+    bpe_index_free(index);
+    bpe_corpus_free(corpus);
+    bpe_symbols_free(&table);
 
-        // Update
-        internal_vocab = new_vocab;
+    // Trim growth slack so the model only keeps what it uses
+    if (model->count > 0 && model->count < model->capacity) {
+        BPEMerge* temp = realloc(model->merges, model->count * sizeof(BPEMerge));
+        if (temp) {
+            model->merges = temp;
+            model->capacity = model->count;
+        }
     }
-    printf("\n");
 
-    /// @note ASAN doesn't catch this.
-    vocab_map_free(internal_vocab);  // Always free before exiting.
     return model;
 }
 
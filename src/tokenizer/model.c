@@ -28,6 +28,21 @@
 #include "tokenizer/bpe.h"
 #include "tokenizer/model.h"
 
+/**
+ * @struct TokenMerge
+ * @brief Precomputed merge lookup entry: the merged token id and its score.
+ */
+typedef struct TokenMerge {
+    int id;  ///< Id of the merged token (a + b).
+    float score;  ///< Score of the merged token (finite by construction).
+} TokenMerge;
+
+/**
+ * @def TOKEN_PAIR_KEY
+ * @brief Packs two token ids into a single 64-bit merge map key.
+ */
+#define TOKEN_PAIR_KEY(a, b) (((int64_t) (a) << 32) | (uint32_t) (b))
+
 /**
  * @section Tokenizer clean up
  * @{
@@ -37,10 +52,6 @@ void token_map_free(HashMap* m) {
     hash_iter_free_all(m, free, free);  // free everything!
 }
 
-void token_ascii_free(HashMap* ascii) {
-    token_map_free(ascii);  // free kv-pairs
-}
-
 void token_set_free(HashSet* tokens) {
     hash_iter_free_all(tokens, free, NULL);  // only free keys!
 }
@@ -53,14 +64,14 @@ void token_to_id_free(HashMap* tokens) {
     token_map_free(tokens);
 }
 
-void token_rank_free(HashMap* ranks) {
-    token_map_free(ranks);
-}
-
 void token_score_free(HashMap* scores) {
     token_map_free(scores);
 }
 
+void token_merge_free(HashMap* merges) {
+    token_map_free(merges);
+}
+
 void token_special_free(SpecialToken* special) {
     if (special) {
         if (special->bos) {
@@ -83,6 +94,7 @@ void tokenizer_free(Tokenizer* t) {
     if (t) {
         token_special_free(t->special);
         token_score_free(t->scores);
+        token_merge_free(t->merges);
         token_to_id_free(t->token_to_id);
         id_to_token_free(t->id_to_token, t->vocab_size);
     }
@@ -109,214 +121,251 @@ SpecialToken* token_special_create(char* bos, char* eos, char* pad, char* unk) {
     return special;
 }
 
-HashMap* token_ascii_create(void) {
-    HashMap* latin1 = hash_map_create(256, HASH_STR);
-    if (!latin1) {
+// Concatenate a merge record's "a b" pair into its merged token.
+// Single source of truth for parsing model merges; returns a newly
+// allocated token or NULL on a malformed pair.
+static char* token_merge_concat(const char* pair) {
+    // A well-formed pair has exactly one interior space
+    const char* space = strchr(pair, ' ');
+    if (!space || space[1] == '\0' || strchr(space + 1, ' ')) {
         return NULL;
     }
 
-    // exact bijection: 0..255
-    for (size_t i = 0; i < 256; i++) {
-        if (!isprint(i)) {
-            continue;  // only include printable chars
-        }
+    // merge pair: t : a + b (one allocation, no split round trip)
+    size_t a_len = (size_t) (space - pair);
+    size_t b_len = strlen(space + 1);
 
-        char* k = calloc(2, sizeof(char));
-        *k = (uint8_t) i;
-        k[1] = '\0';
-
-        int* v = malloc(sizeof(int));
-        *v = i;
-
-        hash_map_insert(latin1, k, v);
+    char* token = malloc(a_len + b_len + 1);
+    if (!token) {
+        return NULL;
     }
 
-    return latin1;
+    memcpy(token, pair, a_len);
+    memcpy(token + a_len, space + 1, b_len + 1);
+    return token;
 }
 
-HashSet* token_set_create(BPEModel* model, HashMap* ascii) {
-    // create the core token set
-    HashSet* set = hash_set_create(model->capacity, HASH_STR);
+HashSet* token_set_create(BPEModel* model) {
+    // Create the core token set, sized for its full population up
+    // front (printable seed bytes + one token per merge) so the build
+    // never rehashes
+    HashSet* set = hash_set_create(2 * (model->count + 256), HASH_STR);
     if (!set) {
         return NULL;
     }
 
-    // Add base tokens for OOV
-    HashEntry* entry;
-    HashIt it = hash_iter(ascii);
-    while ((entry = hash_iter_next(&it))) {
+    // Seed base tokens for OOV straight from the byte range; the
+    // alphabet is known, so no intermediate map is needed
+    for (size_t i = 0; i < 256; i++) {
+        if (!isprint(i)) {
+            continue;  // only include printable chars
+        }
+
+        char* k = calloc(2, sizeof(char));
+        *k = (uint8_t) i;
+        k[1] = '\0';
+
         // returns true on success
-        hash_set_add(set, strdup(entry->key));
+        hash_set_add(set, k);
     }
 
     // parse out merges from model
     for (size_t i = 0; i < model->count; i++) {
-        // get the current merge
-        BPEMerge merge = model->merges[i];
-
-        // parse out the tuple from the current merge pair
-        size_t tuple_count;
-        char** tuple = string_split_delim(merge.pair, " ", &tuple_count);
-        if (tuple_count != 2) {
+        char* token = token_merge_concat(model->merges[i].pair);
+        if (!token) {
             token_set_free(set);
-            string_split_free(tuple, tuple_count);
             return NULL;
         }
-        const char* a = tuple[0];
-        const char* b = tuple[1];
-
-        // merge pair: t : a + b
-        char* token = string_concat(a, b);
 
         // add the token to the set
         hash_set_add(set, token);
-
-        // free the tuple
-        string_split_free(tuple, tuple_count);
     }
 
     // return the token set
     return set;
 }
 
-char** id_to_token_create(HashSet* set, SpecialToken* special, int* out_count) {
-    if (!set || !special) {
+// Append a token to the id array and insert its reverse mapping
+static bool token_maps_add(const char* token, char** tokens, size_t* count, HashMap* token_to_id) {
+    tokens[*count] = strdup(token);
+    if (!tokens[*count]) {
+        return false;
+    }
+
+    int* id = malloc(sizeof(int));
+    *id = (int) *count;
+    if (HASH_SUCCESS != hash_map_insert(token_to_id, strdup(token), id)) {
+        free(id);
+        return false;
+    }
+
+    (*count)++;
+    return true;
+}
+
+char** token_maps_create(HashSet* set, SpecialToken* special, int* out_count, HashMap** out_ids) {
+    if (!set || !special || !out_count || !out_ids) {
         return NULL;
     }
 
-    // create core token list
+    // Exact counts are known upfront: allocate once, index directly
     size_t core_count = 0;
-    // create a shallow copy
-    char** core = calloc(1, sizeof(char*));
+    char** core = malloc((hash_count(set) + 1) * sizeof(char*));
+    if (!core) {
+        return NULL;
+    }
 
     // add core token set to list
     HashEntry* entry = NULL;
     HashIt it = hash_iter(set);
     while ((entry = hash_iter_next(&it))) {
         /// @note Do **not** duplicate keys!
-        core = string_append(entry->key, core, &core_count);
-        if (!core) {
-            free(core);
-            return NULL;
-        }
+        core[core_count++] = entry->key;
     }
 
     // Sort the core token array
     heap_sort_str(core, core_count);
 
-    // Create the output token list
+    // Create the output token list (4 specials + core)
     size_t token_count = 0;
     // primary owner for allocated vocab mappings
-    char** tokens = calloc(1, sizeof(char*));
+    char** tokens = calloc(core_count + 5, sizeof(char*));
+
+    // Element count is known upfront: size once instead of rehash-growing
+    HashMap* token_to_id = hash_map_create(core_count + 4, HASH_STR);  // str -> id
+    if (!tokens || !token_to_id) {
+        free(core);
+        free(tokens);
+        hash_map_free(token_to_id);
+        return NULL;
+    }
 
-    // add special tokens to start of array
-    tokens = string_append(strdup(special->bos), tokens, &token_count);
-    tokens = string_append(strdup(special->eos), tokens, &token_count);
-    tokens = string_append(strdup(special->pad), tokens, &token_count);
-    tokens = string_append(strdup(special->unk), tokens, &token_count);
+    // Both directions are built in the same pass: each token is
+    // appended to the array and mapped to its id exactly once.
+    // Special tokens sit at the start of the array.
+    bool ok = token_maps_add(special->bos, tokens, &token_count, token_to_id)
+              && token_maps_add(special->eos, tokens, &token_count, token_to_id)
+              && token_maps_add(special->pad, tokens, &token_count, token_to_id)
+              && token_maps_add(special->unk, tokens, &token_count, token_to_id);
 
-    for (size_t i = 0; i < core_count; i++) {
-        tokens = string_append(strdup(core[i]), tokens, &token_count);
+    for (size_t i = 0; ok && i < core_count; i++) {
+        ok = token_maps_add(core[i], tokens, &token_count, token_to_id);
     }
 
     // clean up pre-tokens
     free(core);
 
-    // set the output token count
+    if (!ok) {
+        string_split_free(tokens, token_count);
+        hash_iter_free_all(token_to_id, free, free);
+        return NULL;
+    }
+
+    // set the outputs
     *out_count = token_count;
+    *out_ids = token_to_id;  // v : t -> i
 
     // return the token list
     return tokens;  // v : i -> t
 }
 
-HashMap* token_to_id_create(char** id_to_token, int id_count) {
-    if (!id_to_token || !*id_to_token || id_count < 0) {
+HashMap* token_score_create(HashMap* token_to_id, BPEModel* model) {
+    HashMap* scores = hash_map_create(hash_count(token_to_id), HASH_STR);  // str -> float
+    if (!scores) {
         return NULL;
     }
 
-    HashMap* token_to_id = hash_map_create(1, HASH_STR);  // str -> id
-    if (!token_to_id) {
-        return NULL;
+    // every token defaults to unranked; merge tokens are scored below
+    HashEntry* entry;
+    HashIt it = hash_iter(token_to_id);
+    while ((entry = hash_iter_next(&it))) {
+        // allocate memory to score
+        float* score = malloc(sizeof(float));
+        *score = -INFINITY;  // no rank
+
+        // do not share refs!
+        hash_map_insert(scores, strdup(entry->key), score);
     }
 
-    for (size_t i = 0; i < (size_t) id_count; i++) {
-        // shared reference is not to be freed!
-        char* token = strdup(id_to_token[i]);
-        int* id = malloc(sizeof(int));
-        *id = i;
-        if (HASH_SUCCESS != hash_map_insert(token_to_id, token, id)) {
-            hash_map_free(token_to_id);
+    // scores require canonical ordering and require merges as the src;
+    // no intermediate rank map is needed when both passes share a loop
+    for (size_t i = 0; i < model->count; i++) {
+        char* token = token_merge_concat(model->merges[i].pair);
+        if (!token) {
+            token_score_free(scores);
             return NULL;
         }
+
+        // first merge wins if two pairs concatenate to the same token
+        float* score = hash_map_search(scores, token);
+        if (score && isinf(*score)) {
+            *score = -logf(i + 1);  // order matters!
+        }
+        free(token);
     }
 
-    return token_to_id;  // v : t -> i
+    return scores;  // v : t -> f
 }
 
-HashMap* token_rank_create(BPEModel* model) {
-    HashMap* ranks = hash_map_create(1, HASH_STR);  // str -> int
-    if (!ranks) {
+HashMap* token_merge_create(
+    char** id_to_token, int vocab_size, HashMap* token_to_id, HashMap* scores
+) {
+    if (!id_to_token || !token_to_id || !scores) {
         return NULL;
     }
 
-    // scores require cononical ordering and requires merges as the src
-    for (size_t i = 0; i < model->count; i++) {
-        BPEMerge merge = model->merges[i];
-
-        // parse out the tuple from the current merge pair
-        size_t tuple_count;
-        char** tuple = string_split_delim(merge.pair, " ", &tuple_count);
-        if (tuple_count != 2) {
-            string_split_free(tuple, tuple_count);
-            token_score_free(ranks);
-            return NULL;
-        }
-        const char* a = tuple[0];
-        const char* b = tuple[1];
-
-        // merge pair: t : a + b
-        char* token = string_concat(a, b);
+    // packed (a, b) id pair -> TokenMerge
+    HashMap* merges = hash_map_create(vocab_size, HASH_INT64);
+    if (!merges) {
+        return NULL;
+    }
 
-        // copy id
-        int* id = malloc(sizeof(int));
-        *id = i;  // order matters!
+    for (int m = 0; m < vocab_size; m++) {
+        char* token = id_to_token[m];
 
-        // map token to id
-        hash_map_insert(ranks, token, id);
+        // Only ranked tokens are reachable merges (-inf never wins a scan)
+        float* score = hash_map_search(scores, token);
+        if (!score || isinf(*score)) {
+            continue;
+        }
 
-        // free the tuple
-        string_split_free(tuple, tuple_count);
-    }
+        // Every split whose halves are both tokens forms a merge pair
+        size_t len = strlen(token);
+        for (size_t cut = 1; cut < len; cut++) {
+            char* prefix = string_copy_n(token, cut);
+            if (!prefix) {
+                token_merge_free(merges);
+                return NULL;
+            }
 
-    return ranks;  // v : t -> i
-}
+            int* a = hash_map_search(token_to_id, prefix);
+            int* b = hash_map_search(token_to_id, token + cut);
+            free(prefix);
+            if (!a || !b) {
+                continue;
+            }
 
-HashMap* token_score_create(HashMap* token_to_id, HashMap* ranks) {
-    HashMap* scores = hash_map_create(1, HASH_STR);  // str -> float
-    if (!scores) {
-        return NULL;
-    }
+            int64_t* key = malloc(sizeof(int64_t));
+            *key = TOKEN_PAIR_KEY(*a, *b);
 
-    HashEntry* entry;
-    HashIt it = hash_iter(token_to_id);
-    while ((entry = hash_iter_next(&it))) {
-        // get the id for the current score
-        int* id = hash_map_search(ranks, entry->key);
-        // allocate memory to score
-        float* score = malloc(sizeof(float));
+            TokenMerge* merge = malloc(sizeof(TokenMerge));
+            merge->id = m;
+            merge->score = *score;
 
-        // calc score
-        if (!id) {
-            *score = -INFINITY;  // no rank
-        } else {
-            *score = -logf(*id + 1);
+            hash_map_insert(merges, key, merge);
         }
-
-        // do not share refs!
-        hash_map_insert(scores, strdup(entry->key), score);
     }
 
-    return scores;  // v : t -> f
+    return merges;  // v : (a, b) -> (t, f)
+}
+
+void token_byte_lut_create(Tokenizer* t) {
+    // Dense byte -> id fast path: one indexed load replaces a hash probe
+    for (size_t i = 0; i < 256; i++) {
+        char token[2] = {(char) i, '\0'};
+        int* id = hash_map_search(t->token_to_id, token);
+        t->byte_to_id[i] = id ? *id : -1;
+    }
 }
 
 Tokenizer tokenizer_create(BPEModel* model, SpecialToken* special) {
@@ -327,31 +376,26 @@ Tokenizer tokenizer_create(BPEModel* model, SpecialToken* special) {
     // Owns special tokens
     t.special = special;  // Optional (can be NULL)
 
-    // Build ASCII table
-    HashMap* ascii = token_ascii_create();
-    assert(ascii);
-
-    // Create vocab token set
-    HashSet* vocab = token_set_create(model, ascii);
+    // Create vocab token set (seeded with the printable byte alphabet)
+    HashSet* vocab = token_set_create(model);
     assert(vocab);
 
-    // id_to_token (array) and vocab_size
-    t.id_to_token = id_to_token_create(vocab, special, &t.vocab_size);
+    // id_to_token (array), token_to_id (map), and vocab_size in one pass
+    HashMap* token_to_id = NULL;
+    t.id_to_token = token_maps_create(vocab, special, &t.vocab_size, &token_to_id);
+    t.token_to_id = token_to_id;
 
-    // token_to_id (map)
-    t.token_to_id = token_to_id_create(t.id_to_token, t.vocab_size);
+    // scores (for greedy BPE merges; ranked by merge order)
+    t.scores = token_score_create(t.token_to_id, model);
 
-    // ranks (for BPE merges)
-    HashMap* ranks = token_rank_create(model);
-    assert(ranks);
+    // merge lookup (packed id pair -> merged id and score)
+    t.merges = token_merge_create(t.id_to_token, t.vocab_size, t.token_to_id, t.scores);
 
-    // scores (for greedy BPE merges)
-    t.scores = token_score_create(t.token_to_id, ranks);
+    // byte -> id fast path for the encode loop
+    token_byte_lut_create(&t);
 
     // Clean up intermediary representations
-    token_ascii_free(ascii);
     token_set_free(vocab);
-    token_rank_free(ranks);
 
     return t;
 }
@@ -538,6 +582,11 @@ Tokenizer tokenizer_load(const char* path) {
     }
 
     fclose(file);
+
+    // Derived tables: rebuilt from the loaded maps, never serialized
+    t.merges = token_merge_create(t.id_to_token, t.vocab_size, t.token_to_id, t.scores);
+    token_byte_lut_create(&t);
+
     return t;
 }
 
@@ -548,6 +597,17 @@ Tokenizer tokenizer_load(const char* path) {
  * @{
  */
 
+// Probe the merge lookup for the pair (a, b); NULL when not mergeable
+static TokenMerge* token_merge_probe(Tokenizer* t, int a, int b) {
+    // token is unknown and there is no sub
+    if (a == -1 || b == -1) {
+        return NULL;
+    }
+
+    int64_t key = TOKEN_PAIR_KEY(a, b);
+    return hash_map_search(t->merges, &key);
+}
+
 int* tokenizer_encode(Tokenizer* t, char* text, int* seq_len, bool add_bos, bool add_eos) {
     if (!t || !text) {
         return NULL;  // invalid input
@@ -566,85 +626,86 @@ int* tokenizer_encode(Tokenizer* t, char* text, int* seq_len, bool add_bos, bool
         return NULL;
     }
 
-    // encode input text to ids
+    // Resolve the unk fallback once instead of once per unmapped byte
+    int unk_id = -1;  // if -1, unk is not mapped!
+    if (t->special && t->special->unk) {
+        int* id = hash_map_search(t->token_to_id, t->special->unk);
+        if (id) {
+            unk_id = *id;
+        }
+    }
+
+    // encode input text to ids (one indexed load per byte)
     for (size_t i = 0; i < text_len; i++) {
-        char token[2] = {text[i], 0};
+        int id = t->byte_to_id[(uint8_t) text[i]];
+        ids[id_count++] = (id != -1) ? id : unk_id;
+    }
 
-        int* id = hash_map_search(t->token_to_id, token);
-        if (!id) {
-            int* unk_id = NULL;
-            if (t->special && t->special->unk) {
-                unk_id = hash_map_search(t->token_to_id, t->special->unk);
-            }
-            ids[id_count++] = (unk_id) ? *unk_id : -1;  // if -1, unk is not mapped!
-        } else {
-            ids[id_count++] = *id;
-        }
+    // Cache the merge candidate for each adjacent pair; only the
+    // neighborhood of a merge is re-probed between iterations.
+    TokenMerge** cand = calloc(text_len, sizeof(TokenMerge*));
+    if (!cand) {
+        free(ids);
+        return NULL;
+    }
+    for (size_t i = 0; i + 1 < id_count; i++) {
+        cand[i] = token_merge_probe(t, ids[i], ids[i + 1]);
     }
 
-    // greed merges using scores
+    // greedy merges using the precomputed merge lookup
     while (true) {
         float best_score = -INFINITY;
-        int best_id = -1;
-
-        // scan for best merge pair
-        for (size_t i = 0; i < id_count - 1; i++) {
-            // get ids
-            int id_a = ids[i];  // current
-            int id_b = ids[i + 1];  // next
-
-            // token is unknown and there is no sub
-            if (id_a == -1 || id_b == -1) {
-                continue;
-            }
+        TokenMerge* best_merge = NULL;
 
-            // probe for a valid merge pair
-            char* a = t->id_to_token[id_a];
-            char* b = t->id_to_token[id_b];
-            char* merge = string_concat(a, b);
-
-            // probe for a valid score
-            float* score = hash_map_search(t->scores, merge);
-            free(merge);  // clean up
-            if (score && *score > best_score) {
-                best_score = *score;
-                best_id = i;
+        // scan the cached candidates for the best merge pair
+        for (size_t i = 0; i + 1 < id_count; i++) {
+            if (cand[i] && cand[i]->score > best_score) {
+                best_score = cand[i]->score;
+                best_merge = cand[i];
             }
         }
 
-        if (best_id == -1) {
+        if (!best_merge) {
             break;  // no merges left
         }
 
-        // get token ids
-        int id_a = ids[best_id];  // current
-        int id_b = ids[best_id + 1];  // next
-
-        // token is unknown and there is no sub
-        if (id_a == -1 || id_b == -1) {
-            continue;
-        }
+        // Apply every non-overlapping occurrence of the best pair in
+        // one left-to-right pass. Any pair a merge creates involves
+        // the new token, whose merges all rank later (score lower), so
+        // this matches merging one occurrence at a time exactly.
+        size_t out = 0;
+        size_t i = 0;
+        TokenMerge* carry = NULL;  // candidate for the pair ending at out
+        bool seam = false;  // previous output is a fresh merge result
+        while (i < id_count) {
+            bool merged = (i + 1 < id_count && cand[i] == best_merge);
+            TokenMerge* next = NULL;
+
+            if (merged) {
+                ids[out] = best_merge->id;
+            } else {
+                ids[out] = ids[i];
+                next = cand[i];
+            }
 
-        // merge tokens
-        char* a = t->id_to_token[id_a];  // current
-        char* b = t->id_to_token[id_b];  // next
-        char* merge = string_concat(a, b);  // a + b
+            // The pair ending here survives intact unless either side
+            // is a merge result; only the seams are re-probed
+            if (out > 0) {
+                cand[out - 1] = (seam || merged)
+                                    ? token_merge_probe(t, ids[out - 1], ids[out])
+                                    : carry;
+            }
 
-        // get best merge id
-        int* merge_id = hash_map_search(t->token_to_id, merge);
-        free(merge);  // clean up
-        if (!merge_id) {
-            break;
+            carry = next;
+            seam = merged;
+            i += merged ? 2 : 1;
+            out++;
         }
-
-        // update current best merge id
-        ids[best_id] = *merge_id;
-        // remove next best merge id
-        memmove(&ids[best_id + 1], &ids[best_id + 2], (id_count - best_id - 2) * sizeof(int));
-        // update count for removing next merge id
-        id_count--;
+        id_count = out;
     }
 
+    free(cand);
+
     // insert special bos if enabled and present
     if (add_bos && t->special && t->special->bos) {
         int* id = hash_map_search(t->token_to_id, t->special->bos);
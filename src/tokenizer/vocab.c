@@ -11,6 +11,7 @@
 
 #include <string.h>
 #include <stdio.h>
+#include <ctype.h>
 
 #include "core/path.h"
 #include "core/strext.h"
@@ -263,21 +264,68 @@ char* vocab_read_text(const char* path) {
 
 // Create the word frequencies
 HashMap* vocab_create_frequencies(const char* text) {
-    // Pre-tokenize the input text
-    size_t pre_token_count = 0;
-    // Split text by whitespace (0x09, 0x0A, 0x0D, 0x20)
-    char** pre_tokens = string_split_space(text, &pre_token_count);
-
-    // Build word frequencies from pre-tokens
-    HashMap* freqs = hash_map_create(pre_token_count, HASH_STR);
-    for (size_t i = 0; i < pre_token_count; i++) {
-        int* value = hash_map_search(freqs, pre_tokens[i]);
-        if (!value) {
-            // Create a new key
-            char* key = strdup(pre_tokens[i]);
+    // Stream words straight into the map; the corpus is never
+    // materialized as an intermediate token array.
+    HashMap* freqs = hash_map_create(1, HASH_STR);
+    if (!freqs) {
+        return NULL;
+    }
+
+    // Scratch for the current word: repeat occurrences (the common
+    // case) probe and bump the count without touching the allocator
+    size_t word_cap = 64;
+    char* word = malloc(word_cap);
+    if (!word) {
+        vocab_map_free(freqs);
+        return NULL;
+    }
+
+    const char* p = text;
+    while (*p) {
+        // Skip leading whitespace (0x09, 0x0A, 0x0D, 0x20)
+        while (*p && isspace((unsigned char) *p)) {
+            p++;
+        }
+
+        if (!*p) {
+            break;
+        }
 
-            // Create a new value
+        // Mark word start
+        const char* start = p;
+
+        // Find end of word
+        while (*p && !isspace((unsigned char) *p)) {
+            p++;
+        }
+
+        // Stage the current word in scratch
+        size_t len = (size_t) (p - start);
+        if (len + 1 > word_cap) {
+            char* temp = realloc(word, len + 1);
+            if (!temp) {
+                free(word);
+                vocab_map_free(freqs);
+                return NULL;
+            }
+            word = temp;
+            word_cap = len + 1;
+        }
+        memcpy(word, start, len);
+        word[len] = '\0';
+
+        int* value = hash_map_search(freqs, word);
+        if (!value) {
+            // First sight: the map takes its own copy of the key
+            char* key = strdup(word);
             value = malloc(sizeof(int));
+            if (!key || !value) {
+                free(key);
+                free(value);
+                free(word);
+                vocab_map_free(freqs);
+                return NULL;
+            }
             *value = 1;
 
             // Insert new mapping
@@ -287,13 +335,37 @@ HashMap* vocab_create_frequencies(const char* text) {
         }
     }
 
-    // Clean up pre-tokens
-    string_split_free(pre_tokens, pre_token_count);
+    free(word);
 
     // Return hash map
     return freqs;  // text : words -> freqs
 }
 
+// "cat" -> "c a t" in a single pass (no split/join round trip)
+static char* vocab_space_word(const char* word) {
+    size_t len = strlen(word);
+    if (len == 0) {
+        return NULL;
+    }
+
+    // len symbol bytes + (len - 1) spaces + NUL
+    char* symbols = malloc(2 * len);
+    if (!symbols) {
+        return NULL;
+    }
+
+    char* out = symbols;
+    for (size_t i = 0; i < len; i++) {
+        if (i) {
+            *out++ = ' ';
+        }
+        *out++ = word[i];
+    }
+    *out = '\0';
+
+    return symbols;
+}
+
 // Create the symbol frequencies
 HashMap* vocab_create_symbols(HashMap* words) {
     // Create the symbol-freq mapping
@@ -306,15 +378,11 @@ HashMap* vocab_create_symbols(HashMap* words) {
         char* word = entry->key;  // tok -> cat
         int* freq = entry->value;  // freq -> 1
 
-        // "cat" -> {"c", "a", "t"}
-        size_t list_count = 0;
-        char** list = string_split(word, &list_count);
-
-        // {"c", "a", "t"} -> "c a t"
-        char* symbols = string_join(list, list_count, " ");  // new word
-
-        // clean up intermediate representation
-        string_split_free(list, list_count);
+        // "cat" -> "c a t" (new word)
+        char* symbols = vocab_space_word(word);
+        if (!symbols) {
+            continue;
+        }
 
         // handle word to symbol freq mapping
         int* sym_freq = hash_map_search(vocab, symbols);
@@ -323,7 +391,9 @@ HashMap* vocab_create_symbols(HashMap* words) {
             *new_freq = *freq;
             hash_map_insert(vocab, symbols, new_freq);
         } else {
-            *sym_freq += 1;  // inc sym-freq
+            // Collapsed duplicates carry their full word count
+            *sym_freq += *freq;
+            free(symbols);
         }
     }
 
@@ -382,4 +452,27 @@ HashMap* vocab_build(const char* path) {
     return vocab;
 }
 
+// Build the vocabulary, reusing a sidecar cache when it is still fresh
+HashMap* vocab_build_cached(const char* path, const char* cache_path) {
+    // The cache is valid when it is at least as new as the source text
+    long src_mtime = path_mtime(path);
+    long cache_mtime = path_mtime(cache_path);
+    if (src_mtime != -1 && cache_mtime != -1 && src_mtime <= cache_mtime) {
+        HashMap* vocab = vocab_map_load(cache_path);
+        if (vocab) {
+            return vocab;  // warm hit: skip read and tokenize
+        }
+    }
+
+    // Cold or stale cache: rebuild from the source text
+    HashMap* vocab = vocab_build(path);
+    if (!vocab) {
+        return NULL;
+    }
+
+    // Refresh the cache for the next run (best effort)
+    vocab_map_save(vocab, cache_path);
+    return vocab;
+}
+
 /** @} */